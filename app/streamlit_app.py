@@ -4,7 +4,8 @@ import pandas as pd
 from datetime import date
 from src.utils import slugify, ensure_dir
 from src.modeling.baselines import naive, seasonal_naive
-from src.modeling.sarima import fit_predict
+from src.modeling.sarima import fit_arima, predict_arima
+from src.preprocess import load_processed, split_point
 
 RAW = Path("data/raw")
 PROC = Path("data/processed")
@@ -12,6 +13,36 @@ PROC = Path("data/processed")
 st.set_page_config(page_title="Weather Insights", layout="wide")
 st.title("Weather Insights Dashboard")
 
+# Reruns (any widget change) hit these caches; the file mtime invalidates them after a re-ingest.
+@st.cache_data
+def load(path: str, mtime: float) -> pd.DataFrame:
+    return load_processed(path)
+
+@st.cache_resource
+def fit_model(path: str, mtime: float):
+    # fitted once per dataset; horizon changes only re-run the prediction step
+    df = load(path, mtime)
+    return fit_arima(df["tavg"].iloc[:split_point(df)], seasonal_periods=7)
+
+@st.cache_data
+def compute_preds(model: str, path: str, mtime: float, horizon: int) -> tuple[pd.Series, pd.Series, pd.Series]:
+    df = load(path, mtime)
+    y = df["tavg"]
+    i = split_point(df)
+    train, test = y.iloc[:i], y.iloc[i:]
+    future_idx = pd.date_range(y.index.max() + pd.Timedelta(days=1), periods=horizon, freq="D")
+
+    if model == "naive":
+        preds = naive(y).iloc[i:]
+        future = pd.Series(y.iloc[-1], index=future_idx)
+    elif model == "seasonal_naive":
+        preds = seasonal_naive(y).iloc[i:]
+        # same day last year
+        future = pd.Series(y.reindex(future_idx - pd.Timedelta(days=365)).to_numpy(), index=future_idx)
+    else:
+        preds, future = predict_arima(fit_model(path, mtime), train, test, horizon)
+    return test, preds, future
+
 with st.sidebar:
     st.header("Controls")
     location = st.text_input("Location", value="Austin,US")
@@ -32,7 +63,7 @@ if run_ingest:
     r1 = subprocess.run(cmd1, capture_output=True, text=True)
     st.text(r1.stdout if r1.stdout else r1.stderr)
 
-    proc_out = PROC / f"{slug}_proc.csv"
+    proc_out = PROC / f"{slug}_proc.parquet"
     cmd2 = [sys.executable, "-m", "src.preprocess", "--in", str(raw_out), "--out", str(proc_out)]
     st.code(" ".join(cmd2))
     st.info("Preprocessing...")
@@ -41,33 +72,24 @@ if run_ingest:
 
 # Try to load any processed file for the chosen location
 slug = slugify(location)
-proc_path = PROC / f"{slug}_proc.csv"
+proc_path = PROC / f"{slug}_proc.parquet"
+if not proc_path.exists():
+    # datasets processed before the Parquet switch
+    proc_path = PROC / f"{slug}_proc.csv"
 if proc_path.exists():
-    df = pd.read_csv(proc_path, parse_dates=["date"]).set_index("date")
+    mtime = proc_path.stat().st_mtime
+    df = load(str(proc_path), mtime)
     st.subheader(f"Dataset: {location}")
     st.line_chart(df["tavg"])
 
-    test = df[df["is_test"] == 1]["tavg"]
-    y = df["tavg"]
-    train = df[df["is_test"] == 0]["tavg"]
-
-    if model == "naive":
-        preds = naive(y).loc[test.index]
-    elif model == "seasonal_naive":
-        preds = seasonal_naive(y).loc[test.index]
-    else:
-        preds = fit_predict(train, test, seasonal_periods=7)
-
     # Short horizon forecast: continue last date forward
-    last = y.index.max()
-    future_idx = pd.date_range(last + pd.Timedelta(days=1), periods=horizon, freq="D")
-    future = preds.reindex(future_idx)  # crude demo; SARIMA supports dynamic forecasts if extended
+    test, preds, future = compute_preds(model, str(proc_path), mtime, horizon)
 
     st.subheader("Test vs Prediction (last year)")
     chart_df = pd.DataFrame({"actual": test, "pred": preds})
     st.line_chart(chart_df)
 
-    st.subheader(f"{horizon}-day Forecast (toy)")
+    st.subheader(f"{horizon}-day Forecast")
     st.line_chart(future.dropna())
 else:
     st.warning("No processed dataset found yet. Use the sidebar button to fetch data first.")
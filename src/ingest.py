@@ -3,19 +3,34 @@ Fetch daily weather using Open-Meteo with robust geocoding and coord fallback.
 - Accepts either a place string (e.g., "Austin,US" or "Austin, Texas")
   or explicit coords via --coords "30.2672,-97.7431".
 - Auto-selects archive vs forecast API based on dates.
+- Responses are cached on disk (data/cache/openmeteo.sqlite): ranges ending more than
+  ARCHIVE_SETTLE_DAYS ago never expire, anything more recent (archive lag, forecasts)
+  after an hour. Pass --force-refresh to bypass every cache.
+- Resolved places are remembered in data/cache/geocode.json, so repeat runs skip
+  the geocoder entirely. Pass --no-cache to look just the place up again.
 
 Usage (place):
   python -m src.ingest --location "Austin,US" --start 2023-01-01 --end 2023-03-31 --outfile data/raw/austin_q1_2023.csv
 
 Usage (coords to bypass geocoder):
   python -m src.ingest --coords "30.2672,-97.7431" --label "Austin,US" --start 2023-01-01 --end 2023-03-31 --outfile data/raw/austin_q1_2023.csv
+
+Usage (several places, fetched concurrently, one CSV each in data/raw/):
+  python -m src.ingest --locations "Austin,US;Seattle,WA;Boston,MA" --start 2023-01-01 --end 2023-03-31
 """
 from __future__ import annotations
 import argparse
-from datetime import date, datetime
+import asyncio
+import json
+import os
+from datetime import date, datetime, timedelta
+from functools import lru_cache
 from pathlib import Path
 import re
+import tempfile
+import httpx
 import requests
+from requests_cache import CachedSession, NEVER_EXPIRE
 import pandas as pd
 
 from .utils import ensure_dir, slugify, ROOT
@@ -39,8 +54,32 @@ STATE_MAP = {
 
 HEADERS = {"User-Agent": "weather-insights/0.1 (educational use)"}
 
+_COORDS_RE = re.compile(r"^\s*(-?\d+(?:\.\d+)?)\s*,\s*(-?\d+(?:\.\d+)?)\s*$")
+
+HTTP_CACHE = ROOT / "data" / "cache" / "openmeteo"
+GEO_CACHE = ROOT / "data" / "cache" / "geocode.json"
+# the archive lags real time by several days and returns nulls for that stretch
+ARCHIVE_SETTLE_DAYS = 7
+
+@lru_cache(maxsize=None)
+def _session() -> CachedSession:
+    # one pooled session per process; daily data lifetimes are set per request (_expire_after)
+    ensure_dir(HTTP_CACHE.parent)
+    s = CachedSession(str(HTTP_CACHE), expire_after=timedelta(days=30), urls_expire_after={
+        FORECAST_URL: timedelta(hours=1),
+    })
+    s.headers.update(HEADERS)
+    return s
+
+def _expire_after(end_iso: str):
+    # settled history never changes; a range touching the last few days may still be filling in
+    e = datetime.strptime(end_iso, "%Y-%m-%d").date()
+    if e < date.today() - timedelta(days=ARCHIVE_SETTLE_DAYS):
+        return NEVER_EXPIRE
+    return timedelta(hours=1)
+
 def parse_coords(text: str) -> tuple[float,float] | None:
-    m = re.match(r"^\s*(-?\d+(?:\.\d+)?)\s*,\s*(-?\d+(?:\.\d+)?)\s*$", text)
+    m = _COORDS_RE.match(text)
     if not m: return None
     lat = float(m.group(1)); lon = float(m.group(2))
     return lat, lon
@@ -51,8 +90,8 @@ def _pick_base_url(start_iso: str, end_iso: str) -> str:
     e = datetime.strptime(end_iso, "%Y-%m-%d").date()
     return ARCHIVE_URL if e < today else FORECAST_URL
 
-def geocode_place(place: str) -> dict:
-    # Try progressively: exact tokens → city only → city + admin1 guess
+def _geo_queries(place: str) -> tuple[list[dict], str | None]:
+    # Lookups in priority order: exact tokens → city only → city + admin1 guess
     tokens = [t.strip() for t in place.split(",") if t.strip()]
     city = tokens[0] if tokens else place.strip()
     admin1 = None
@@ -74,32 +113,20 @@ def geocode_place(place: str) -> dict:
             if t1.lower() in {"united states", "usa", "u.s.", "us"}:
                 country_code = "US"
 
-    # 1) Try city + optional filters
+    # 1) city + optional filters
     params = {"name": city, "count": 5, "language": "en", "format": "json"}
     if admin1: params["admin1"] = admin1
     if country_code: params["country_code"] = country_code
-    r = requests.get(GEO_URL, params=params, headers=HEADERS, timeout=30)
-    r.raise_for_status()
-    data = r.json()
-    results = data.get("results", []) or []
-
-    # If nothing, try city only
-    if not results:
-        r2 = requests.get(GEO_URL, params={"name": city, "count": 5, "language": "en", "format": "json"},
-                          headers=HEADERS, timeout=30)
-        r2.raise_for_status()
-        data2 = r2.json()
-        results = data2.get("results", []) or []
-
-    # If still nothing and we inferred a state name, try forcing admin1 with US
-    if not results and admin1:
-        r3 = requests.get(GEO_URL, params={"name": city, "admin1": admin1, "country_code": "US", "count": 5,
-                                           "language": "en", "format": "json"},
-                          headers=HEADERS, timeout=30)
-        r3.raise_for_status()
-        data3 = r3.json()
-        results = data3.get("results", []) or []
+    queries = [params]
+    # 2) city only
+    queries.append({"name": city, "count": 5, "language": "en", "format": "json"})
+    # 3) if we inferred a state name, force admin1 with US
+    if admin1:
+        queries.append({"name": city, "admin1": admin1, "country_code": "US", "count": 5,
+                        "language": "en", "format": "json"})
+    return queries, admin1
 
+def _pick_result(place: str, results: list[dict], admin1: str | None) -> dict:
     if not results:
         raise ValueError(f"Could not geocode location: {place}")
 
@@ -110,23 +137,79 @@ def geocode_place(place: str) -> dict:
                 return res
     return results[0]
 
-def fetch_daily_by_coords(lat: float, lon: float, label: str, start: str, end: str) -> pd.DataFrame:
-    base = _pick_base_url(start, end)
-    params = {
+def _geo_key(place: str) -> str:
+    return ",".join(t.strip().lower() for t in place.split(",") if t.strip())
+
+def _load_geocache() -> dict:
+    try:
+        return json.loads(GEO_CACHE.read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def _remember(place: str, loc: dict) -> None:
+    # re-read right before writing so concurrent lookups don't drop each other's entries;
+    # tmpfile + rename keeps the file whole if we die mid-write
+    cache = _load_geocache()
+    cache[_geo_key(place)] = loc
+    ensure_dir(GEO_CACHE.parent)
+    # unique tmp name: processes writing at once must not share (and clobber) one tmpfile
+    with tempfile.NamedTemporaryFile("w", dir=GEO_CACHE.parent, suffix=".tmp", delete=False) as f:
+        json.dump(cache, f, indent=1)
+    os.replace(f.name, GEO_CACHE)
+
+def geocode_place(place: str, force_refresh: bool = False, use_cache: bool = True) -> dict:
+    if use_cache and not force_refresh and (hit := _load_geocache().get(_geo_key(place))):
+        return hit
+    # skipping the JSON cache means a real lookup, not the HTTP cache's stored answer
+    loc = _geocode_place(place, force_refresh or not use_cache)
+    _remember(place, loc)
+    return loc
+
+def _geocode_place(place: str, force_refresh: bool) -> dict:
+    queries, admin1 = _geo_queries(place)
+    results = []
+    for params in queries:
+        r = _session().get(GEO_URL, params=params, timeout=30, force_refresh=force_refresh)
+        r.raise_for_status()
+        results = r.json().get("results", []) or []
+        if results:
+            break
+    return _pick_result(place, results, admin1)
+
+async def geocode_place_async(client: httpx.AsyncClient, place: str, use_cache: bool = True) -> dict:
+    if use_cache and (hit := _load_geocache().get(_geo_key(place))):
+        return hit
+    # fire every fallback at once; keep the first non-empty answer in priority order
+    queries, admin1 = _geo_queries(place)
+    responses = await asyncio.gather(*(client.get(GEO_URL, params=q, timeout=30) for q in queries))
+    results = []
+    for r in responses:
+        r.raise_for_status()
+        results = r.json().get("results", []) or []
+        if results:
+            break
+    loc = _pick_result(place, results, admin1)
+    _remember(place, loc)
+    return loc
+
+def _daily_params(lat: float, lon: float, start: str, end: str) -> dict:
+    return {
         "latitude": lat, "longitude": lon,
         "start_date": start, "end_date": end,
         "daily": ",".join(DAILY_VARS),
         "timezone": "auto",
     }
-    r = requests.get(base, params=params, headers=HEADERS, timeout=90)
+
+def _raise_for_status(r) -> None:
     try:
         r.raise_for_status()
-    except requests.HTTPError as e:
+    except (requests.HTTPError, httpx.HTTPStatusError) as e:
         detail = ""
         try: detail = r.json()
         except Exception: detail = r.text[:300]
         raise SystemExit(f"Open-Meteo error {r.status_code} on {r.url}\nDetails: {detail}") from e
 
+def _daily_frame(r, base: str, lat: float, lon: float, label: str) -> pd.DataFrame:
     dd = r.json().get("daily", {})
     if not dd:
         raise ValueError(f"No daily data returned from {base}. URL was:\n{r.url}")
@@ -147,37 +230,81 @@ def fetch_daily_by_coords(lat: float, lon: float, label: str, start: str, end: s
     df["lat"] = lat; df["lon"] = lon
     return df[["date","tmin","tmax","tavg","precip","wind_max","location","lat","lon"]]
 
-def fetch_daily(place: str, start: str, end: str) -> pd.DataFrame:
-    loc = geocode_place(place)
-    label = f'{loc["name"]},{loc.get("country_code","")}'
-    return fetch_daily_by_coords(loc["latitude"], loc["longitude"], label, start, end)
+def fetch_daily_by_coords(lat: float, lon: float, label: str, start: str, end: str,
+                          force_refresh: bool = False) -> pd.DataFrame:
+    base = _pick_base_url(start, end)
+    r = _session().get(base, params=_daily_params(lat, lon, start, end), timeout=90,
+                       expire_after=_expire_after(end), force_refresh=force_refresh)
+    _raise_for_status(r)
+    return _daily_frame(r, base, lat, lon, label)
+
+async def fetch_daily_by_coords_async(client: httpx.AsyncClient, lat: float, lon: float, label: str,
+                                      start: str, end: str) -> pd.DataFrame:
+    base = _pick_base_url(start, end)
+    r = await client.get(base, params=_daily_params(lat, lon, start, end))
+    _raise_for_status(r)
+    return _daily_frame(r, base, lat, lon, label)
+
+def _label(loc: dict) -> str:
+    return f'{loc["name"]},{loc.get("country_code","")}'
+
+def fetch_daily(place: str, start: str, end: str, force_refresh: bool = False,
+                use_cache: bool = True) -> pd.DataFrame:
+    loc = geocode_place(place, force_refresh=force_refresh, use_cache=use_cache)
+    return fetch_daily_by_coords(loc["latitude"], loc["longitude"], _label(loc), start, end, force_refresh=force_refresh)
+
+async def fetch_many(locations: list[str], start: str, end: str, use_cache: bool = True) -> list[pd.DataFrame]:
+    # one pooled client for every request, so connections/TLS are reused across places
+    async with httpx.AsyncClient(headers=HEADERS, timeout=90) as client:
+        async def one(place: str) -> pd.DataFrame:
+            loc = await geocode_place_async(client, place, use_cache=use_cache)
+            return await fetch_daily_by_coords_async(client, loc["latitude"], loc["longitude"], _label(loc), start, end)
+        return list(await asyncio.gather(*(one(p) for p in locations)))
+
+def _default_outfile(label: str, start: str, end: str) -> Path:
+    return ROOT / "data" / "raw" / f"{slugify(label)}_{start}_{end}.csv"
+
+def _save(df: pd.DataFrame, out: Path) -> None:
+    ensure_dir(out.parent)
+    df.to_csv(out, index=False)
+    print(f"Saved {len(df):,} rows to {out}")
 
 def main():
     p = argparse.ArgumentParser()
     p.add_argument("--location", help='e.g. "Austin,US" or "Austin, Texas"')
+    p.add_argument("--locations", help='several places separated by ";", fetched concurrently, e.g. "Austin,US;Boston,MA"')
     p.add_argument("--coords", help='lat,lon e.g. "30.2672,-97.7431" (bypasses geocoder)')
     p.add_argument("--label", help='Label for coords mode, e.g. "Austin,US"')
     p.add_argument("--start", required=True)
     p.add_argument("--end", required=True)
     p.add_argument("--outfile", default=None, help="Path to CSV in data/raw/")
+    p.add_argument("--force-refresh", action="store_true", help="Ignore cached API responses and re-fetch")
+    p.add_argument("--no-cache", action="store_true", help="Re-run geocoding against the API, ignoring data/cache/geocode.json")
     args = p.parse_args()
 
+    if args.locations:
+        if args.outfile:
+            raise SystemExit("--outfile is not supported with --locations; each place is saved to data/raw/")
+        places = [t.strip() for t in args.locations.split(";") if t.strip()]
+        for df in asyncio.run(fetch_many(places, args.start, args.end, use_cache=not (args.no_cache or args.force_refresh))):
+            _save(df, _default_outfile(df["location"].iloc[0], args.start, args.end))
+        return
+
     if args.coords:
         latlon = parse_coords(args.coords)
         if not latlon:
             raise SystemExit(f"Invalid --coords: {args.coords}. Expected 'lat,lon'.")
         lat, lon = latlon
         label = args.label or f"coords({lat:.4f},{lon:.4f})"
-        df = fetch_daily_by_coords(lat, lon, label, args.start, args.end)
+        df = fetch_daily_by_coords(lat, lon, label, args.start, args.end, force_refresh=args.force_refresh)
     elif args.location:
-        df = fetch_daily(args.location, args.start, args.end)
+        df = fetch_daily(args.location, args.start, args.end, force_refresh=args.force_refresh,
+                         use_cache=not args.no_cache)
     else:
-        raise SystemExit("Provide --location or --coords")
+        raise SystemExit("Provide --location, --locations or --coords")
 
-    out = Path(args.outfile) if args.outfile else (ROOT / "data" / "raw" / f"{slugify(df['location'].iloc[0])}_{args.start}_{args.end}.csv")
-    ensure_dir(out.parent)
-    df.to_csv(out, index=False)
-    print(f"Saved {len(df):,} rows to {out}")
+    out = Path(args.outfile) if args.outfile else _default_outfile(df["location"].iloc[0], args.start, args.end)
+    _save(df, out)
 
 if __name__ == "__main__":
     main()
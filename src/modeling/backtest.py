@@ -1,63 +1,91 @@
 from __future__ import annotations
 import argparse
+from concurrent.futures import ProcessPoolExecutor
 from math import sqrt
 from pathlib import Path
 import pandas as pd
+import matplotlib
+matplotlib.use("Agg")  # files only: skip GUI backend probing
 import matplotlib.pyplot as plt
 from sklearn.metrics import mean_absolute_error, mean_squared_error
 from .baselines import naive, seasonal_naive
-from .sarima import fit_predict
-from ..utils import ensure_dir
+from .sarima import ARIMA_ENGINE, forecast
+from ..preprocess import load_processed, split_point
+from ..utils import ensure_dir, metrics_writer
+
+MODELS = ["naive","seasonal_naive","sarima"]
+
+_canvas = None
 
 def evaluate(y_true, y_pred) -> tuple[float,float]:
     mae = mean_absolute_error(y_true, y_pred)
     rmse = sqrt(mean_squared_error(y_true, y_pred))
     return mae, rmse
 
+def _run_one(name: str, y: pd.Series, i: int) -> tuple[float, float, pd.Series]:
+    train, test = y.iloc[:i], y.iloc[i:]
+    if name == "naive":
+        preds = naive(y).iloc[i:]
+    elif name == "seasonal_naive":
+        preds = seasonal_naive(y, period=365).iloc[i:]
+    else:
+        preds = forecast(train, test, seasonal_periods=7)
+    mae, rmse = evaluate(test, preds)
+    return mae, rmse, preds
+
+def plot_test(test: pd.Series, results: dict, title: str, out: str) -> None:
+    # one Figure per process, cleared between calls, so sweeps don't rebuild it each run
+    global _canvas
+    if _canvas is None:
+        _canvas = plt.subplots(figsize=(10,4))
+    fig, ax = _canvas
+    ax.clear()
+    test.plot(ax=ax, label="actual")
+    for name, (_, _, preds) in results.items():
+        preds.plot(ax=ax, label=name if len(results) > 1 else "pred")
+    ax.set_title(title)
+    ax.legend()
+    fig.tight_layout()
+    ensure_dir(Path(out).parent)
+    fig.savefig(out, dpi=150)
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--dataset", required=True)
-    ap.add_argument("--model", choices=["naive","seasonal_naive","sarima"], default="sarima")
+    ap.add_argument("--model", choices=MODELS + ["all"], default="sarima")
     ap.add_argument("--horizon", type=int, default=7)
     ap.add_argument("--metrics_out", default="reports/metrics/metrics.csv")
     ap.add_argument("--plot_out", default="reports/figures/test_pred.png")
+    ap.add_argument("--no-plot", action="store_true", help="Skip drawing the test-window figure")
     args = ap.parse_args()
 
-    df = pd.read_csv(args.dataset, parse_dates=["date"]).set_index("date")
+    df = load_processed(args.dataset)
     y = df["tavg"]
-    train = df[df["is_test"] == 0]["tavg"]
-    test  = df[df["is_test"] == 1]["tavg"]
+    i = split_point(df)
+    test = y.iloc[i:]
 
-    if args.model == "naive":
-        preds = naive(y).loc[test.index]
-    elif args.model == "seasonal_naive":
-        preds = seasonal_naive(y, period=365).loc[test.index]
+    names = MODELS if args.model == "all" else [args.model]
+    if len(names) == 1:
+        results = {names[0]: _run_one(names[0], y, i)}
     else:
-        preds = fit_predict(train, test, seasonal_periods=7)
-
-    mae, rmse = evaluate(test, preds)
+        # models are independent: the baselines finish while SARIMA is still fitting
+        with ProcessPoolExecutor(max_workers=len(names)) as ex:
+            futures = {name: ex.submit(_run_one, name, y, i) for name in names}
+            results = {name: fut.result() for name, fut in futures.items()}
 
     # write metrics
-    mpath = Path(args.metrics_out)
-    ensure_dir(mpath.parent)
-    import csv
-    write_header = not mpath.exists()
-    with mpath.open("a", newline="") as f:
-        w = csv.writer(f)
-        if write_header:
-            w.writerow(["model","mae","rmse"])
-        w.writerow([args.model, f"{mae:.3f}", f"{rmse:.3f}"])
-
-    # plot
-    ensure_dir(Path(args.plot_out).parent)
-    plt.figure(figsize=(10,4))
-    test.plot(label="actual")
-    preds.plot(label="pred")
-    plt.title(f"{args.model} – test window")
-    plt.legend()
-    plt.tight_layout()
-    plt.savefig(args.plot_out, dpi=150)
-    print(f"{args.model} -> MAE {mae:.3f}  RMSE {rmse:.3f}\nSaved plot to {args.plot_out}")
+    # --model sarima runs AutoARIMA when statsforecast is installed; label rows by engine
+    results = {ARIMA_ENGINE if name == "sarima" else name: r for name, r in results.items()}
+    with metrics_writer(args.metrics_out) as write:
+        for name, (mae, rmse, _) in results.items():
+            write(name, mae, rmse)
+
+    for name, (mae, rmse, _) in results.items():
+        print(f"{name} -> MAE {mae:.3f}  RMSE {rmse:.3f}")
+
+    if not args.no_plot:
+        plot_test(test, results, f"{args.model} – test window", args.plot_out)
+        print(f"Saved plot to {args.plot_out}")
 
 if __name__ == "__main__":
     main()
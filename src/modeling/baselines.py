@@ -2,9 +2,22 @@ from __future__ import annotations
 import pandas as pd
 import numpy as np
 
+def _values(y: pd.Series) -> np.ndarray:
+    # keep float32/float64 as-is; ints become float64 so NaN padding fits (as Series.shift does)
+    return y.to_numpy(dtype=y.dtype if y.dtype.kind == "f" else np.float64)
+
+def _shift(a: np.ndarray, k: int) -> np.ndarray:
+    out = np.empty_like(a)
+    out[:k] = np.nan
+    out[k:] = a[:max(len(a) - k, 0)]
+    return out
+
 def naive(y: pd.Series) -> pd.Series:
-    return y.shift(1)
+    return pd.Series(_shift(_values(y), 1), index=y.index, name=y.name)
 
 def seasonal_naive(y: pd.Series, period: int = 365) -> pd.Series:
-    ysn = y.shift(period)
-    return ysn.fillna(y.shift(1))
+    a = _values(y)
+    out = _shift(a, period)
+    gaps = np.isnan(out)
+    out[gaps] = _shift(a, 1)[gaps]
+    return pd.Series(out, index=y.index, name=y.name)
@@ -1,11 +1,11 @@
 from __future__ import annotations
 import argparse
-import pandas as pd
-from pathlib import Path
-from sklearn.linear_model import Ridge
+import numpy as np
+from scipy.linalg import solve
 from sklearn.metrics import mean_absolute_error, mean_squared_error
 from math import sqrt
-from ..utils import ensure_dir
+from ..preprocess import load_processed
+from ..utils import metrics_writer
 
 FEATS = [
     "tavg_lag_1","tavg_lag_7","tavg_lag_14",
@@ -13,39 +13,41 @@ FEATS = [
     "dow","month","is_weekend"
 ]
 
+def ridge_fit(X: np.ndarray, y: np.ndarray, alpha: float = 1.0) -> tuple[np.ndarray, float]:
+    # same objective as sklearn Ridge(fit_intercept=True): center, then one Cholesky solve
+    # of (XᵀX + αI)β = Xᵀy on the small FEATS x FEATS system
+    xm, ym = X.mean(axis=0), y.mean()
+    Xc = X - xm
+    A = Xc.T @ Xc
+    A.flat[::A.shape[0] + 1] += alpha
+    beta = solve(A, Xc.T @ (y - ym), assume_a="pos")
+    return beta, ym - xm @ beta
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--dataset", required=True)
     ap.add_argument("--out_metrics", default="reports/metrics/metrics.csv")
     args = ap.parse_args()
 
-    df = pd.read_csv(args.dataset, parse_dates=["date"]).set_index("date")
-    y = df["tavg"]
-    X = df[FEATS]
-
-    train = df[df["is_test"] == 0]
-    test  = df[df["is_test"] == 1]
+    df = load_processed(args.dataset)
+    X = df[FEATS].to_numpy(dtype=np.float32)
+    y = df["tavg"].to_numpy(dtype=np.float32)
 
-    Xtr, ytr = train[FEATS].dropna(), train["tavg"].loc[train[FEATS].dropna().index]
-    Xte, yte = test[FEATS].dropna(),  test["tavg"].loc[test[FEATS].dropna().index]
+    # one complete-features mask, reused for both splits
+    ok = ~np.isnan(X).any(axis=1)
+    is_test = df["is_test"].to_numpy() == 1
+    tr, te = ok & ~is_test, ok & is_test
 
-    model = Ridge(alpha=1.0)
-    model.fit(Xtr, ytr)
-    preds = model.predict(Xte)
+    beta, intercept = ridge_fit(X[tr], y[tr], alpha=1.0)
+    preds = X[te] @ beta + intercept
+    yte = y[te]
 
     mae = mean_absolute_error(yte, preds)
     rmse = sqrt(mean_squared_error(yte, preds))
 
-    out = Path(args.out_metrics)
-    ensure_dir(out.parent)
     # append row
-    import csv
-    write_header = not out.exists()
-    with out.open("a", newline="") as f:
-        w = csv.writer(f)
-        if write_header:
-            w.writerow(["model","mae","rmse"])
-        w.writerow(["ridge_ml", f"{mae:.3f}", f"{rmse:.3f}"])
+    with metrics_writer(args.out_metrics) as write:
+        write("ridge_ml", mae, rmse)
     print(f"ML Ridge -> MAE {mae:.3f}  RMSE {rmse:.3f}")
 
 if __name__ == "__main__":
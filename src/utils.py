@@ -1,12 +1,27 @@
+from contextlib import contextmanager
 from pathlib import Path
+import csv
 import re
 
 ROOT = Path(__file__).resolve().parents[1]
 
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+_MULTI_US = re.compile(r'_+')
+
 def ensure_dir(p: Path) -> None:
     p.mkdir(parents=True, exist_ok=True)
 
 def slugify(name: str) -> str:
-    s = name.lower().strip()
-    s = re.sub(r'[^a-z0-9]+', '_', s)
-    return re.sub(r'_+', '_', s).strip('_')
+    return _MULTI_US.sub('_', _NON_ALNUM.sub('_', name.lower().strip())).strip('_')
+
+@contextmanager
+def metrics_writer(path):
+    # one open (and one header probe) for a whole batch of (model, mae, rmse) rows
+    p = Path(path)
+    ensure_dir(p.parent)
+    write_header = not p.exists()
+    with p.open("a", newline="") as f:
+        w = csv.writer(f)
+        if write_header:
+            w.writerow(["model","mae","rmse"])
+        yield lambda model, mae, rmse: w.writerow([model, f"{mae:.3f}", f"{rmse:.3f}"])
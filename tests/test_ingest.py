@@ -0,0 +1,43 @@
+from datetime import date, timedelta
+from requests_cache import NEVER_EXPIRE
+from src import ingest
+
+def test_recent_ranges_are_not_cached_forever():
+    old = (date.today() - timedelta(days=30)).isoformat()
+    recent = (date.today() - timedelta(days=2)).isoformat()
+    assert ingest._expire_after(old) == NEVER_EXPIRE
+    assert ingest._expire_after(recent) == timedelta(hours=1)
+
+class _FakeSession:
+    def __init__(self):
+        self.calls = []
+
+    def get(self, url, params=None, timeout=None, force_refresh=False, **kw):
+        self.calls.append(force_refresh)
+        return self
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {"results": [{"name": "Austin", "latitude": 30.27, "longitude": -97.74, "country_code": "US"}]}
+
+def _geo_env(monkeypatch, tmp_path):
+    fake = _FakeSession()
+    monkeypatch.setattr(ingest, "GEO_CACHE", tmp_path / "geocode.json")
+    monkeypatch.setattr(ingest, "_session", lambda: fake)
+    return fake
+
+def test_geocode_cache_hit_skips_network(monkeypatch, tmp_path):
+    fake = _geo_env(monkeypatch, tmp_path)
+    first = ingest.geocode_place("Austin,US")
+    assert ingest.geocode_place("austin, us") == first
+    assert len(fake.calls) == 1
+    assert list(tmp_path.iterdir()) == [tmp_path / "geocode.json"]
+
+def test_no_cache_and_force_refresh_hit_the_network(monkeypatch, tmp_path):
+    fake = _geo_env(monkeypatch, tmp_path)
+    ingest.geocode_place("Austin,US")
+    ingest.geocode_place("Austin,US", use_cache=False)
+    ingest.geocode_place("Austin,US", force_refresh=True)
+    assert fake.calls == [False, True, True]
@@ -0,0 +1,12 @@
+import numpy as np
+from sklearn.linear_model import Ridge
+from src.modeling.ml_regressor import ridge_fit
+
+def test_ridge_fit_matches_sklearn():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(200, 9)).astype(np.float32) + 5
+    y = (X @ rng.normal(size=9) + 3 + rng.normal(size=200)).astype(np.float32)
+    beta, intercept = ridge_fit(X, y, alpha=1.0)
+    ref = Ridge(alpha=1.0).fit(X.astype(np.float64), y.astype(np.float64))
+    np.testing.assert_allclose(beta, ref.coef_, rtol=1e-3, atol=1e-3)
+    np.testing.assert_allclose(intercept, ref.intercept_, rtol=1e-3, atol=1e-3)
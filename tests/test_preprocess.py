@@ -1,5 +1,7 @@
+import numpy as np
 import pandas as pd
 from pathlib import Path
+from src.preprocess import add_calendar, add_lags_rolls, interpolate_gaps, load_processed
 
 def test_processed_has_features():
     p = Path("data/processed")
@@ -7,10 +9,36 @@ def test_processed_has_features():
     if not p.exists():
         assert True
         return
-    files = list(p.glob("*_proc.csv"))
+    files = list(p.glob("*_proc.parquet")) + list(p.glob("*_proc.csv"))
     if not files:
         assert True
         return
-    df = pd.read_csv(files[0])
+    df = load_processed(files[0])
     needed = {"tavg","tavg_lag_1","tavg_lag_7","tavg_lag_14","tavg_roll_mean_7","dow","month","is_weekend","is_test"}
     assert needed.issubset(set(df.columns))
+
+def test_lags_rolls_match_pandas():
+    vals = np.arange(40, dtype=float)
+    vals[[5, 20]] = np.nan
+    df = pd.DataFrame({"tavg": vals}, index=pd.date_range("2020-01-01", periods=40))
+    out = add_lags_rolls(df.copy())
+    pd.testing.assert_series_equal(out["tavg_lag_7"], df["tavg"].shift(7), check_names=False)
+    pd.testing.assert_series_equal(out["tavg_roll_std_7"], df["tavg"].rolling(7).std(), check_names=False)
+    pd.testing.assert_series_equal(out["tavg_roll_mean_30"], df["tavg"].rolling(30).mean(), check_names=False)
+
+def test_interpolate_gaps_matches_pandas():
+    nan = np.nan
+    df = pd.DataFrame({
+        "a": [nan, nan, 1, nan, nan, nan, nan, nan, 7, nan, 9, nan, nan, nan, nan, nan],
+        "b": [0, 1, nan, 3, nan, nan, 6, 7, 8, nan, nan, nan, nan, nan, 14, 15],
+    })
+    out = interpolate_gaps(df.to_numpy(dtype=np.float64), limit=3)
+    np.testing.assert_allclose(out, df.interpolate(limit=3).to_numpy())
+
+def test_calendar_matches_datetimeindex():
+    idx = pd.date_range("1969-12-25", "1970-02-10")
+    out = add_calendar(pd.DataFrame(index=idx))
+    assert (out["dow"].to_numpy() == idx.dayofweek).all()
+    assert (out["month"].to_numpy() == idx.month).all()
+    assert (out["is_weekend"].to_numpy() == (idx.dayofweek >= 5)).all()
+    assert out["dow"].dtype == np.int8
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.modeling import sarima
+from src.modeling.sarima import _fill_gaps
+
+def _gapped_series(n=1500):
+    rng = np.random.default_rng(0)
+    idx = pd.date_range("2019-01-01", periods=n)
+    weekly = np.tile([0, 1, 2, 1, 0, -1, -2], n // 7 + 1)[:n]
+    y = pd.Series(20 + 10 * np.sin(np.arange(n) * 2 * np.pi / 365) + weekly + rng.normal(size=n), index=idx)
+    y.iloc[[0, 200, 700, 701]] = np.nan
+    return y
+
+def test_fill_gaps_leaves_no_nans():
+    y = _gapped_series()
+    filled = _fill_gaps(y)
+    assert len(filled) == len(y) and not np.isnan(filled).any()
+    np.testing.assert_array_equal(filled[~y.isna().to_numpy()], y.dropna().to_numpy())
+
+def test_fast_forecast_survives_gaps():
+    pytest.importorskip("statsforecast")
+    from src.modeling.sarima import fit_predict_fast
+    y = _gapped_series()
+    train, test = y.iloc[:-365], y.iloc[-365:]
+    preds = fit_predict_fast(train, test)
+    # a NaN-poisoned fit degrades to a random walk, i.e. a flat line
+    assert preds.notna().all() and np.ptp(preds.iloc[:28].to_numpy()) > 1.0
+
+def test_predict_arima_dispatches_on_fitted_model(monkeypatch, tmp_path):
+    monkeypatch.setattr(sarima, "CACHE_DIR", tmp_path)
+    y = _gapped_series(1000)
+    train, test = y.iloc[:-60], y.iloc[-60:]
+    preds, future = sarima.predict_arima(sarima.fit(train), train, test, horizon=5)
+    assert len(preds) == 60 and len(future) == 5 and future.notna().all()
+
+def test_fast_future_survives_gaps_in_test():
+    pytest.importorskip("statsforecast")
+    from src.modeling.sarima import fit_fast, predict_arima
+    y = _gapped_series()
+    y.iloc[-10] = np.nan
+    train, test = y.iloc[:-365], y.iloc[-365:]
+    _, future = predict_arima(fit_fast(train), train, test, horizon=14)
+    assert future.notna().all() and np.ptp(future.to_numpy()) > 1.0
+
+def test_fit_reuses_cached_params(monkeypatch, tmp_path):
+    monkeypatch.setattr(sarima, "CACHE_DIR", tmp_path)
+    y = _gapped_series(1000)
+    train, test = y.iloc[:-60], y.iloc[-60:]
+    cold = sarima.fit(train)
+    warm = sarima.fit(train)
+    assert hasattr(cold, "mle_retvals") and not hasattr(warm, "mle_retvals")
+    np.testing.assert_array_equal(sarima.predict_arima(warm, train, test)[0], sarima.predict_arima(cold, train, test)[0])
+
+def test_fit_warm_starts_from_similar_length(monkeypatch, tmp_path):
+    monkeypatch.setattr(sarima, "CACHE_DIR", tmp_path)
+    y = _gapped_series(1000)
+    first = sarima.fit(y.iloc[:800])
+    seen = []
+    real_fit = sarima.SARIMAX.fit
+    def spy(self, *args, **kw):
+        seen.append(kw.get("start_params"))
+        return real_fit(self, *args, **kw)
+    monkeypatch.setattr(sarima.SARIMAX, "fit", spy)
+    sarima.fit(y.iloc[:760])  # same len // 365 bucket, different values
+    np.testing.assert_array_equal(seen[0], first.params)